@@ -51,7 +51,7 @@ def main():
         df_clean = None
         if clean_file.exists():
             print(f"Existing clean file already exists ({clean_name})")
-            df_clean = pd.read_csv(clean_file)
+            df_clean = pd.read_csv(clean_file, parse_dates=["Date"], date_format="%Y-%m-%d")
         else:
             print(f"Creating clean file for ({clean_name})")
             df_clean = build_clean_commodity_from_parts(parts_dir=parts_dir, out_file=clean_file)
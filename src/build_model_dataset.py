@@ -10,9 +10,11 @@ import numpy as np
 def load_features_ready(path: Path):
     # We keep feature construction separate from merging so each step stays simple and reproducible.
 
-    df = pd.read_csv(path)
+    # Feature files store ISO dates, so the C reader parses them directly.
+    df = pd.read_csv(path, parse_dates=["Date"], date_format="%Y-%m-%d")
 
     # Dates are enforced and sorted so the dataset is a proper time series before any shift/merge.
+    # If the file was not ISO-dated, the column is still text here and is coerced explicitly.
     df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
     df = df.dropna(subset=["Date"]).sort_values("Date")
 
@@ -30,7 +32,7 @@ def load_features_ready(path: Path):
 
 def load_conflict_index(path: Path, cols_keep: list[str]):
     # Conflict indices are merged as external regressors, so they must have clean daily dates.
-    conflict_df = pd.read_csv(path)
+    conflict_df = pd.read_csv(path, parse_dates=["Date"], date_format="%Y-%m-%d")
 
     # We standardize dates to the same daily format as the commodity dataset to ensure a clean join key.
     conflict_df["Date"] = pd.to_datetime(conflict_df["Date"], errors="coerce")
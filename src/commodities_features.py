@@ -24,10 +24,13 @@ def build_features_df(df: pd.DataFrame, price_col: str = "Price", date_col: str
     out = out.dropna(subset=[date_col, price_col]).sort_values(date_col)
 
     # Log returns are used because they are standard in finance and additive over time
-    out["Log_Ret"] = np.log(out[price_col] / out[price_col].shift(1))
+    price = out[price_col].to_numpy(dtype=np.float64)
+    log_ret = np.full(price.shape, np.nan)
+    log_ret[1:] = np.log(price[1:] / price[:-1])
+    out["Log_Ret"] = log_ret
 
     # Squared log returns provide a daily proxy for realized variance, which is the basic building block of HAR models
-    out["RV_Daily"] = out["Log_Ret"] ** 2
+    out["RV_Daily"] = log_ret * log_ret
 
     # Weekly and monthly components capture volatility persistence at different horizons, as in the HAR framework
     out["RV_Weekly"] = out["RV_Daily"].rolling(5).mean()
@@ -51,7 +54,7 @@ def process_features_file(input_path: Path, output_path: Path):
         return
 
     # Raw data are loaded from disk before feature construction
-    df = pd.read_csv(input_path)
+    df = pd.read_csv(input_path, parse_dates=["Date"], date_format="%Y-%m-%d")
 
     # Feature construction is isolated in a single function to keep the logic clear and testable.
     df_features = build_features_df(df)
@@ -15,179 +15,167 @@ IMPORTANT: If you want to download the data yourself, you need to:
 """
 from __future__ import annotations
 
+import csv
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import List
 
 import numpy as np
 import pandas as pd
 
 # 1. Numeric & Date Cleaning
-def _convert_numeric(value: object):
-    # Investing.com mixes commas, percentages, and K/M suffixes in numeric fields.
-    # Returning NaN on failure makes data issues explicit and traceable. (<-IA Input)
-    if not isinstance(value, str) or not value:
-        if isinstance(value, (int, float)):
-            return float(value)
-        return np.nan
+# Suffix codes used by the numeric cleaning: 0 = plain, 1 = %, 2 = K, 3 = M.
+# Scaling is a table lookup on the codes, so no Python string logic runs per cell.
+_SUFFIX_CODES = {"": 0, "%": 1, "K": 2, "M": 3}
+_SUFFIX_SCALE = np.array([1.0, 1.0, 1_000.0, 1_000_000.0])
+
+# One pattern splits a cell into its number and its optional suffix in a single scan.
+_NUM_RE = re.compile(r"^\s*([-+]?[\d,.]+)\s*([%KMkm]?)\s*$")
 
-    try:
-        v = value.strip()
 
-        # Percentage values are stored as strings and must be cleaned explicitly.
-        if "%" in v:
-            v = v.replace("%", "")
-            return float(v.replace(",", ""))
+def _scale_by_suffix(raw: np.ndarray, codes: np.ndarray):
+    # Volumes with K/M suffixes represent thousands/millions and are rounded to whole units once scaled.
+    out = raw * _SUFFIX_SCALE[codes]
+    return np.where(codes >= 2, np.round(out), out)
 
-        u = v.upper()
 
-        # Volumes with K suffix represent thousands and should be scaled explicitly.
-        if "K" in u:
-            u = u.replace("K", "")
-            return round(float(u.replace(",", "")) * 1_000.0)
+def _convert_numeric_series(values: pd.Series):
+    # Investing.com mixes commas, percentages, and K/M suffixes in numeric fields.
+    # Returning NaN on failure makes data issues explicit and traceable. (<-IA Input)
+    parts = values.str.extract(_NUM_RE)
 
-        # Volumes with M suffix represent millions and should be scaled explicitly.
-        if "M" in u:
-            u = u.replace("M", "")
-            return round(float(u.replace(",", "")) * 1_000_000.0)
+    # Failed parsing is made explicit instead of silently injecting noise. (<-IA Input)
+    raw = pd.to_numeric(parts[0].str.replace(",", "", regex=False), errors="coerce")
+    codes = parts[1].str.upper().map(_SUFFIX_CODES).fillna(0).to_numpy(dtype=np.uint8)
 
-        return float(v.replace(",", ""))
-    except Exception:
-        # Failed parsing is made explicit instead of silently injecting noise. (<-IA Input)
-        return np.nan
+    return pd.Series(_scale_by_suffix(raw.to_numpy(dtype=np.float64), codes), index=values.index)
 
 
-def _standardize_date(date_str: object):
+def _standardize_date_series(values: pd.Series):
     # Dates are normally in US format, but explicit parsing is used as a safeguard.
     # Invalid formats are converted to NaT instead of being guessed.
-    if not isinstance(date_str, str) or not date_str:
-        return pd.NaT
-
-    s = date_str.strip('"\' ')
-    return pd.to_datetime(s, format="%m/%d/%Y", errors="coerce")
+    # The whole column goes through one strptime pass instead of one pd.to_datetime call per row.
+    return pd.to_datetime(values.str.strip('"\' '), format="%m/%d/%Y", errors="coerce")
 
 # 2. Raw CSV Parsing (<- IA Input; safeguard in case a file contains extra rows)
-def _find_header_row_idx(raw_df: pd.DataFrame) -> Optional[int]:
-    # Some files include metadata rows before the actual header.
-    # Searching for "Date" ensures the correct header is used.
-    for idx, row in raw_df.iterrows():
-        v = row.iloc[0]
-        if isinstance(v, str) and "Date" in v:
-            return idx
-    return None
-
-
-def _parse_header(header_row: str):
-    # Column names are stored as a single comma-separated string. This step extracts clean column names from that string.
-    return [col.strip('"\' ') for col in header_row.split(",")]
-
-
-def _split_row(row_str: str, n_cols: int):
-    # Quoted values may contain commas, which would break simple splitting.
-    # A simple state-based parser avoids column shifts and malformed rows.
-    if not isinstance(row_str, str):
-        return [None] * n_cols
-
-    values: List[str] = []
-    current = ""
-    in_quotes = False
-
-    for char in row_str:
-        if char == '"':
-            in_quotes = not in_quotes
-        elif char == "," and not in_quotes:
-            values.append(current.strip('"\' '))
-            current = ""
-            continue
-        current += char
-
-    if current:
-        values.append(current.strip('"\' '))
-
-    # This prevents malformed rows from breaking the downstream pipeline. (<- IA suggestion)
-    if len(values) < n_cols:
-        values.extend([None] * (n_cols - len(values)))
-    return values[:n_cols]
-
-
-def read_investing_raw_csv(path: Path):
+# Some files include metadata rows before the actual header; they only ever appear at the very top.
+_HEADER_SCAN_LINES = 20
+
+# Standardize column names to a canonical format. Investing.com uses "Last" for the closing price; renaming to "Price
+_RENAME_MAP = {
+    "Last": "Price",
+    "Vol.": "Vol.",
+    "Volume": "Vol.",
+    "Var. %": "Change %"}
+
+_NUMERIC_COLS = ["Price", "Open", "High", "Low", "Vol.", "Change %"]
+
+
+def _drop_duplicate_dates(df: pd.DataFrame):
+    # The frame is already sorted by date, so duplicates are neighbours: comparing each date code with the
+    # previous one keeps the first row per date (same as drop_duplicates keep="first") without a hashtable.
+    codes = df["Date"].to_numpy(dtype="datetime64[ns]").view("int64")
+    keep = np.empty(len(codes), dtype=bool)
+    keep[:1] = True
+    np.not_equal(codes[1:], codes[:-1], out=keep[1:])
+    return df if keep.all() else df.iloc[keep]
+
+
+def _clean_chunk(df: pd.DataFrame):
+    # Convert dates using the strict US format. Otherwise we could have maybe some bugs. 
+    df["Date"] = _standardize_date_series(df["Date"])
+
+    # Convert numeric columns explicitly.
+    # All numeric columns are stacked into one Series so the cleaning runs as a single vectorized pass.
+    # Volumes and % changes repeat a lot, so only the distinct strings are parsed and then mapped back.
+    cols = [c for c in _NUMERIC_COLS if c in df.columns]
+    if cols:
+        codes, uniques = pd.factorize(df[cols].to_numpy(dtype=object).ravel(order="F"), use_na_sentinel=False)
+        converted = _convert_numeric_series(pd.Series(uniques, dtype=object)).to_numpy()[codes]
+        df[cols] = converted.reshape((len(df), len(cols)), order="F")
+
+    return df
+
+
+def read_investing_raw_csv(path: Path, chunksize: int = 100_000):
     # Raw files are read entirely as strings to avoid implicit pandas casting.
     # All conversions are handled explicitly and consistently.
-    try:
-        raw_df = pd.read_csv(path, header=None, low_memory=False, dtype=str)
-    except pd.errors.EmptyDataError:
+    # Each line is a single quoted field wrapping the actual comma-separated row; the csv tokenizer unwraps it
+    # line by line from the file handle.
+    path = Path(path)
+    with path.open("r", encoding="utf-8-sig", newline="") as fh:
+        row_strings = [fields[0] for fields in csv.reader(fh) if fields]
+
+    if not row_strings:
         print(f"Attention: Empty file ignored: {path.name}")
         return pd.DataFrame()
 
-    # Locate the header row dynamically to handle variable file structures. (Same IA suggestion as for the _find_header_row_idx)
-    header_row_idx = _find_header_row_idx(raw_df)
-    if header_row_idx is None:
-        header_row_idx = 0
-        header_row = raw_df.iloc[0, 0]
+    # Locate the header row dynamically to handle variable file structures. Searching for "Date" ensures the correct header is used.
+    header_row_idx = next(
+        (idx for idx, v in enumerate(row_strings[:_HEADER_SCAN_LINES]) if "Date" in v), 0)
+
+    # The unwrapped rows are parsed by the pandas C tokenizer: it handles quoted values containing commas.
+    # Rows are cut to the header width (usecols) and short rows are padded, so malformed rows cannot shift columns.
+    n_cols = len(next(csv.reader([row_strings[header_row_idx]])))
+    reader = pd.read_csv(
+        io.StringIO("\n".join(row_strings[header_row_idx:])),
+        header=0,
+        dtype=str,
+        engine="c",
+        na_filter=False,
+        index_col=False,
+        usecols=range(n_cols),
+        chunksize=chunksize)
+
+    # Rows are parsed and cleaned chunk by chunk. The unwrapped rows and the joined text buffer stay in memory
+    # for the whole read, so this only bounds the parsed string frames and the cleaning intermediates.
+    chunks: List[pd.DataFrame] = []
+    with reader:
+        for raw_chunk in reader:
+            raw_chunk.columns = [_RENAME_MAP.get(c, c) for c in raw_chunk.columns.str.strip('"\' ')]
+
+            # Without a Date column, the data cannot be used for time-series analysis.
+            if "Date" not in raw_chunk.columns:
+                print(f"Attention: 'Date' column not found in {path.name}")
+                return pd.DataFrame()
+
+            chunks.append(_clean_chunk(raw_chunk))
+
+    # Most files fit in one chunk; concat is only needed when there are several.
+    if len(chunks) == 1:
+        df = chunks[0]
     else:
-        header_row = raw_df.iloc[header_row_idx, 0]
-
-    if not isinstance(header_row, str):
-        header_row = str(header_row)
-
-    column_names = _parse_header(header_row)
-    n_cols = len(column_names)
-
-    # Raw files store each row as a single string; rows are rebuilt manually
-    # Manual parsing is used to keep full control over column alignment.
-    data_rows: List[List[Optional[str]]] = []
-    for idx, row in raw_df.iterrows():
-        if idx == header_row_idx:
-            continue
-        v = row.iloc[0]
-        if not isinstance(v, str):
-            continue
-        data_rows.append(_split_row(v, n_cols))
-
-    df = pd.DataFrame(data_rows, columns=column_names)
-
-    # Standardize column names to a canonical format. Investing.com uses "Last" for the closing price; renaming to "Price
-    rename_map = {
-        "Last": "Price",
-        "Vol.": "Vol.",
-        "Volume": "Vol.",
-        "Var. %": "Change %"}
-    
-    df = df.rename(columns=rename_map)
-
-    # Without a Date column, the data cannot be used for time-series analysis.
-    if "Date" not in df.columns:
-        print(f"Attention: 'Date' column not found in {path.name}")
-        return pd.DataFrame()
-
-    # Convert dates using the strict US format. Otherwise we could have maybe some bugs. 
-    df["Date"] = df["Date"].apply(_standardize_date)
-
-    # Convert numeric columns explicitly.
-    cols_numeric = ["Price", "Open", "High", "Low", "Vol.", "Change %"]
-    for col in cols_numeric:
-        if col in df.columns:
-            df[col] = df[col].apply(_convert_numeric)
+        df = pd.concat(chunks, ignore_index=True, sort=False, copy=False)
 
     # Rows without valid dates are unusable and removed. We don't take the risk. 
-    df = df.dropna(subset=["Date"]).copy()
-
     # Price is the core variable for volatility estimation and must be present. Normally is shouldn't happen but just to be safe.
+    # Both conditions are combined into one mask so the frame is filtered only once.
+    mask = df["Date"].notna()
     if "Price" in df.columns:
-        df = df.dropna(subset=["Price"])
+        mask &= df["Price"].notna()
+    df = df.loc[mask]
 
     # Sorting ensures chronological consistency.
-    df = df.sort_values("Date")
+    # Mergesort is stable and fast on files that are already (reverse) chronological.
+    df = df.sort_values("Date", kind="mergesort")
 
     # A single observation per date avoids double counting. (There is possible that there are duplicates in the different raw csv)
-    df = df.drop_duplicates(subset=["Date"], keep="first")
+    df = _drop_duplicate_dates(df)
 
-    # Keep a stable and predictable column order.
-    ordered = ["Date", "Price", "Open", "High", "Low", "Vol.", "Change %"]
-    keep = [c for c in ordered if c in df.columns]
+    # Columns built from strings can stay as object dtype; typed columns let the
+    # downstream log returns and rolling windows run on plain float arrays.
+    df = df.astype({c: "float64" for c in _NUMERIC_COLS if c in df.columns})
+    df["Date"] = df["Date"].astype("datetime64[ns]")
 
-    return df.loc[:, keep]
+    return df
 
 # 3. Main Pipeline
+# Below this total size of part files, parsing is faster than starting a process pool.
+_PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
 def build_clean_commodity_from_parts(parts_dir: Path, out_file: Path):
     # Large downloads are often split into multiple files.
     # Merging all parts ensures full historical coverage.
@@ -200,18 +188,30 @@ def build_clean_commodity_from_parts(parts_dir: Path, out_file: Path):
     if not files:
         raise FileNotFoundError(f"No CSV parts found in: {parts_dir}")
 
-    frames: List[pd.DataFrame] = []
-    for f in files:
-        df_part = read_investing_raw_csv(f)
-        if not df_part.empty:
-            frames.append(df_part)
+    # Part files are independent, so large downloads are parsed in parallel (one process per file, up to the core count).
+    # Small ones (a few 100 KB parse in tens of ms) stay serial: starting worker processes would cost more than the parsing.
+    # ex.map keeps the sorted file order, so the merge below is unchanged.
+    n_workers = min(len(files), os.cpu_count() or 1)
+    if n_workers > 1 and sum(f.stat().st_size for f in files) >= _PARALLEL_MIN_BYTES:
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            parts = list(ex.map(read_investing_raw_csv, files))
+    else:
+        parts = [read_investing_raw_csv(f) for f in files]
+
+    frames: List[pd.DataFrame] = [df_part for df_part in parts if not df_part.empty]
 
     # If no valid data is extracted, the issue should be visible immediately.
     if not frames:
         print(f"Attention: No valid data extracted from {parts_dir}")
         return pd.DataFrame()
 
-    df = pd.concat(frames, ignore_index=True, sort=False)
+    # Every part has the same float64/datetime64 dtypes (enforced in read_investing_raw_csv),
+    # so pandas can reuse the underlying blocks instead of upcasting them.
+    # A single part needs no concat at all; the sort below already returns a new frame.
+    if len(frames) == 1:
+        df = frames[0]
+    else:
+        df = pd.concat(frames, ignore_index=True, sort=False, copy=False)
 
     # Losing the Date column would invalidate the entire pipeline.
     if "Date" not in df.columns:
@@ -219,11 +219,11 @@ def build_clean_commodity_from_parts(parts_dir: Path, out_file: Path):
 
     # Final sorting and deduplication act as a safety check after merging.
     df = df.sort_values("Date")
-    df = df.drop_duplicates(subset=["Date"], keep="first")
+    df = _drop_duplicate_dates(df)
 
+    # Keep a stable and predictable column order. This is done once here rather than per part file.
     ordered = ["Date", "Price", "Open", "High", "Low", "Vol.", "Change %"]
-    keep = [c for c in ordered if c in df.columns]
-    df = df.loc[:, keep]
+    df = df.reindex(columns=[c for c in ordered if c in df.columns], copy=False)
     # All checks are applied to ensure a clean and reliable merged dataset.
 
     # Saving a single clean CSV guarantees reproducibility downstream.
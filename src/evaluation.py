@@ -1,11 +1,68 @@
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
+from functools import lru_cache
+from joblib import Parallel, delayed
 from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
 from src.models import fit_random_forest, predict_random_forest
 
+@lru_cache(maxsize=32)
+def _conflict_candidates(columns: tuple[str, ...]):
+    # Lag-1 EWMA log-death columns of a dataset, cached per column set:
+    # every commodity run on the same dataset layout reuses the same scan
+    # Names are lowercased once and matched with vectorized Index.str masks
+    cols = pd.Index(columns, dtype=object)
+    low = cols.str.lower()
+    mask = (
+        low.str.contains("log_deaths", regex=False)
+        & low.str.contains("ewma_94", regex=False)
+        & cols.str.endswith("_lag1"))
+    return tuple(cols[mask])
+
+def _walk_forward_ols(Z: np.ndarray, y: np.ndarray, window_size: int, step_size: int, n_cols: tuple[int, ...]):
+    # One-step-ahead OLS forecasts for every walk-forward step, computed on plain arrays in a single call.
+    # Keeping this out of the main loop means the linear models pay no pandas or per-step bookkeeping cost.
+    # One forecast path is returned per entry of n_cols, each using the first n_cols columns of Z as regressors
+    # (nested models such as HAR inside HAR-X share a single design matrix and a single Gram build).
+    n_obs = len(y)
+    if n_obs <= window_size:
+        return [np.empty(0) for _ in n_cols]
+
+    # All training windows are strided views of the design matrix (steps x regressors x window), so no window is copied.
+    # Their normal equations are built with one batched matmul and solved with one batched LAPACK call.
+    Z_win = sliding_window_view(Z, window_size, axis=0)[: n_obs - window_size : step_size]
+    y_win = sliding_window_view(y, window_size)[: n_obs - window_size : step_size]
+    XtX = Z_win @ Z_win.transpose(0, 2, 1)
+    Xty = Z_win @ y_win[:, :, None]
+
+    # The normal equations of a nested model are the leading block of the full ones
+    # Only the point forecast is needed: each test row is dotted with the coefficients of its own window
+    Z_test = Z[window_size::step_size]
+    preds = []
+    for k in n_cols:
+        # Rank-deficient or badly conditioned windows (e.g. a regressor constant over the window, collinear with the intercept)
+        # are found up front from each window's design matrix; the Gram matrix squares the conditioning, so neither its rank
+        # nor a failing solve flags them reliably. Windows with cond(X) above 1e7 are solved by SVD on X (minimum-norm OLS,
+        # singular values below machine precision dropped), the others through the normal equations.
+        well_conditioned = np.linalg.matrix_rank(Z_win[:, :k], rtol=1e-7) == k
+        betas = np.empty((len(XtX), k))
+        if well_conditioned.any():
+            betas[well_conditioned] = np.linalg.solve(
+                XtX[well_conditioned, :k, :k], Xty[well_conditioned, :k])[:, :, 0]
+        for i in np.flatnonzero(~well_conditioned):
+            betas[i] = np.linalg.lstsq(Z_win[i, :k].T, y_win[i], rcond=None)[0]
+        preds.append(np.einsum("np,np->n", Z_test[:, :k], betas))
+    return preds
+
+def _rf_segment_forecasts(X: np.ndarray, y: np.ndarray, t_steps: np.ndarray, window_size: int, cache: bool):
+    # One Random Forest refit segment: fit on the window before the first step, then predict every step it serves
+    # The model is fixed until the next refit, so all of its steps are predicted in one batched call
+    t0 = t_steps[0]
+    model = fit_random_forest(X[t0 - window_size : t0], y[t0 - window_size : t0], random_state=42, cache=cache)
+    return predict_random_forest(model, X[t_steps])
+
 def run_walk_forward(
     file_path: Path,
     commodity_name: str,
@@ -13,36 +70,46 @@ def run_walk_forward(
     step_size: int = 5,
     start_date: str = "2015-01-01",
     end_date: str = "2024-12-31",
-    rf_refit_every: int = 25):
+    rf_refit_every: int = 25,
+    rf_cache: bool = False):
 
     print(f"OUT-OF-SAMPLE FORECAST: {commodity_name}")
 
     # Load the final modeling dataset and restrict to a recent regime
     # This avoids mixing very different volatility regimes and reduces runtime
-    data = pd.read_csv(file_path, parse_dates=["Date"])
-    data = data[(data["Date"] >= start_date) & (data["Date"] <= end_date)].copy()
+    data = pd.read_csv(file_path, parse_dates=["Date"], date_format="%Y-%m-%d")
+    # Model datasets are already sorted by date, so the window is found by binary search and taken as one slice
+    if data["Date"].is_monotonic_increasing:
+        dates = data["Date"].to_numpy()
+        lo = np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), side="left")
+        hi = np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), side="right")
+        data = data.iloc[lo:hi]
+    else:
+        data = data[(data["Date"] >= start_date) & (data["Date"] <= end_date)]
 
     # Standard HAR features 
     features_har = ["RV_Daily", "RV_Weekly", "RV_Monthly"]
     target_var = "Target_RV"
 
     # Conflict variables must be lagged (lag 1 only) to avoid look-ahead bias
-    conflict_candidates = [
-        c for c in data.columns
-        if "log_deaths" in c.lower()
-        and "ewma_94" in c.lower()
-        and c.endswith("_lag1")]
+    conflict_candidates = _conflict_candidates(tuple(data.columns))
 
     # Commodity-specific regional exposure (Hypothesis H2)
     name = commodity_name.lower()
     if "wti" in name or "oil" in name:
-        conflict_vars = [c for c in conflict_candidates if "middle_east" in c.lower()]
+        region = "middle_east"
     elif "gas" in name:
-        conflict_vars = [c for c in conflict_candidates if "europe" in c.lower()]
+        region = "europe"
     elif "gold" in name:
-        conflict_vars = [c for c in conflict_candidates if "global" in c.lower()]
+        region = "global"
     else:
+        region = None
+
+    candidates_idx = pd.Index(conflict_candidates, dtype=object)
+    if region is None:
         conflict_vars = []
+    else:
+        conflict_vars = candidates_idx[candidates_idx.str.lower().str.contains(region, regex=False)].tolist()
 
     # We include at most one conflict proxy to keep interpretation clean
     conflict_var = conflict_vars[0] if len(conflict_vars) > 0 else None
@@ -59,107 +126,86 @@ def run_walk_forward(
     required_cols = ["Date"] + features_harx + [target_var]
     data = data[required_cols].dropna().reset_index(drop=True)
 
-    # Walk-forward evaluation mimics real-time forecasting
-    results = []
-
-    rf_model = None
-    rf_last_fit_index = None
-
-    for t in range(window_size, len(data), step_size):
-
-        train = data.iloc[t - window_size : t]
-        test = data.iloc[[t]]
-
-        actual_vol = float(test[target_var].iloc[0])
-
-        # HAR baseline (linear benchmark)
-        har_model = sm.OLS(
-            train[target_var],
-            sm.add_constant(train[features_har], has_constant="add")).fit()
-
-        har_pred = float(
-            har_model.predict(
-                sm.add_constant(test[features_har], has_constant="add")).iloc[0])
+    # Design matrix (constant + regressors), built once; training windows are slices of it
+    # HAR-X only appends the conflict column to the HAR regressors, so HAR uses the leading columns of the same matrix
+    n_obs = len(data)
+    y_all = data[target_var].to_numpy(dtype=np.float64)
 
-        harx_pred = np.nan
-        rf_pred = np.nan
+    Z_aug = np.empty((n_obs, 1 + len(features_harx)))
+    Z_aug[:, 0] = 1.0
+    Z_aug[:, 1:] = data[features_harx].to_numpy(dtype=np.float64)
+    n_har = 1 + len(features_har)
 
-        if use_conflict:
-            # HAR-X tests whether conflict intensity adds predictive information
-            harx_model = sm.OLS(
-                train[target_var],
-                sm.add_constant(train[features_harx], has_constant="add")).fit()
-
-            harx_pred = float(
-                harx_model.predict(
-                    sm.add_constant(test[features_harx], has_constant="add")).iloc[0])
-
-            # Random Forest used as a non-linear benchmark
-            # Refit only occasionally to reduce computation time
-            if rf_model is None or (t - rf_last_fit_index) >= rf_refit_every:
-                rf_model = fit_random_forest(
-                    train[features_harx],
-                    train[target_var],
-                    random_state=42)
-                
-                rf_last_fit_index = t
-
-            rf_pred = float(predict_random_forest(rf_model, test[features_harx])[0])
-
-        results.append({
-            "Date": test["Date"].iloc[0],
-            "Actual": actual_vol,
-            "HAR": har_pred,
-            "HAR_X": harx_pred,
-            "RF": rf_pred})
+    # Walk-forward evaluation mimics real-time forecasting
+    # Forecasts are written into preallocated typed arrays, one slot per walk-forward step
+    t_index = np.arange(window_size, n_obs, step_size)
+    n_steps = len(t_index)
+
+    # HAR baseline (linear benchmark) and HAR-X (tests whether conflict intensity adds predictive information)
+    # Both are scored for all steps up front; only the Random Forest is run segment by segment below
+    harx_preds = np.full(n_steps, np.nan)
+    rf_preds = np.full(n_steps, np.nan)
+    if use_conflict:
+        har_preds, harx_preds = _walk_forward_ols(Z_aug, y_all, window_size, step_size, (n_har, Z_aug.shape[1]))
+    else:
+        har_preds, = _walk_forward_ols(Z_aug, y_all, window_size, step_size, (n_har,))
 
-        if len(results) % 25 == 0:
-            print(f"Progress: {len(results)}")
+    if use_conflict:
+        # sklearn trees work on float32 features; the target stays float64
+        X_rf = np.ascontiguousarray(Z_aug[:, 1:], dtype=np.float32)
+
+        # Random Forest used as a non-linear benchmark
+        # Refit only occasionally to reduce computation time: a refit happens once rf_refit_every days have passed
+        refit_steps = []
+        last_fit = None
+        for k, t in enumerate(t_index):
+            if last_fit is None or (t - last_fit) >= rf_refit_every:
+                refit_steps.append(k)
+                last_fit = t
+        segments = list(zip(refit_steps, refit_steps[1:] + [n_steps]))
+
+        # Each segment (one fit + the steps it serves) is independent of the others, so segments run in parallel
+        # Results come back in segment order, so forecasts are identical to a sequential run
+        jobs = Parallel(n_jobs=-1, return_as="generator")(
+            delayed(_rf_segment_forecasts)(X_rf, y_all, t_index[a:b], window_size, rf_cache)
+            for a, b in segments)
+
+        for (a, b), preds in zip(segments, jobs):
+            rf_preds[a:b] = preds
+            # Progress is reported every 25 forecasts, whatever the segment boundaries
+            for done in range(25 * (a // 25 + 1), b + 1, 25):
+                print(f"Progress: {done}")
 
     # Drop rows with missing forecasts to ensure fair comparison
-    results_df = pd.DataFrame(results).dropna()
+    # The mask is taken on the forecast arrays, so the frame is built once from the kept rows (step numbers as index)
+    valid = ~(np.isnan(har_preds) | np.isnan(harx_preds) | np.isnan(rf_preds))
+    t_valid = t_index[valid]
+    results_df = pd.DataFrame({
+        "Date": data["Date"].to_numpy()[t_valid],
+        "Actual": y_all[t_valid],
+        "HAR": har_preds[valid],
+        "HAR_X": harx_preds[valid],
+        "RF": rf_preds[valid]},
+        index=np.flatnonzero(valid))
 
     # Evaluation metrics
+    # Forecasts are stacked into one (model, time) matrix so each metric is a single reduction over all models
     y = results_df["Actual"].to_numpy()
-    y_har = results_df["HAR"].to_numpy()
-    y_harx = results_df["HAR_X"].to_numpy()
-    y_rf = results_df["RF"].to_numpy()
-
-    # MAE measures average absolute forecast error (robust to outliers)
-    def mae(a, b):
-        return np.mean(np.abs(a - b))
-
-    # RMSE penalizes large forecast errors more strongly
-    def rmse(a, b):
-        return np.sqrt(np.mean((a - b) ** 2))
+    P = results_df[["HAR", "HAR_X", "RF"]].to_numpy().T
+    E = P - y
 
     # RMSE on logs evaluates relative (proportional) forecast accuracy
     # Small floor is applied only for numerical stability
     eps = max(1e-12, np.quantile(y, 0.01) * 0.1)
-
-    def rmse_log(a, b):
-        a = np.clip(a, eps, None)
-        b = np.clip(b, eps, None)
-        return np.sqrt(np.mean((np.log(a) - np.log(b)) ** 2))
+    E_log = np.log(np.clip(P, eps, None)) - np.log(np.clip(y, eps, None))
 
     # Evaluation matrix summarizing forecast performance by model
+    # MAE measures average absolute forecast error (robust to outliers), RMSE penalizes large forecast errors more strongly
     metrics = pd.DataFrame({
         "Model": ["HAR", "HAR-X", "RF"],
-        "MAE": [
-            mae(y, y_har),
-            mae(y, y_harx),
-            mae(y, y_rf),
-        ],
-        "RMSE": [
-            rmse(y, y_har),
-            rmse(y, y_harx),
-            rmse(y, y_rf),
-        ],
-        "RMSE_log": [
-            rmse_log(y, y_har),
-            rmse_log(y, y_harx),
-            rmse_log(y, y_rf),
-        ]})
+        "MAE": np.mean(np.abs(E), axis=1),
+        "RMSE": np.sqrt(np.mean(E * E, axis=1)),
+        "RMSE_log": np.sqrt(np.mean(E_log * E_log, axis=1))})
 
     print("\nEvaluation metrics:")
     print(metrics)
@@ -178,23 +224,26 @@ def run_walk_forward(
     metrics.to_csv(out_dir / "metrics.csv", sep=";", float_format="%.6f")
 
     # Visual comparison of out-of-sample forecasts
-    plt.figure(figsize=(10, 4))
+    # The figure is drawn with the object-oriented API on a standalone Figure (Agg canvas): nothing goes through
+    # pyplot's global figure manager, and the interactive backend of a notebook importing this module is left untouched
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+    dates = results_df["Date"].to_numpy()
     
     # 1. Tracé des courbes
-    plt.plot(results_df["Date"], results_df["Actual"], label="Actual", linewidth=2)
-    plt.plot(results_df["Date"], results_df["HAR"], label="HAR")
-    plt.plot(results_df["Date"], results_df["HAR_X"], label="HAR-X")
-    plt.plot(results_df["Date"], results_df["RF"], label="RF")
+    ax.plot(dates, y, label="Actual", linewidth=2)
+    ax.plot(dates, P[0], label="HAR")
+    ax.plot(dates, P[1], label="HAR-X")
+    ax.plot(dates, P[2], label="RF")
 
     # 2. Zoom automatique (Calcul du max raisonnable sans le pic Covid)
-    robust_max = results_df["Actual"].quantile(0.995)
-    plt.ylim(0, robust_max * 1.1)
+    robust_max = np.quantile(y, 0.995)
+    ax.set_ylim(0, robust_max * 1.1)
 
     # 3. Finitions et sauvegarde
-    plt.legend()
-    plt.title(f"{commodity_name.upper()} — Out-of-sample forecasts")
-    plt.tight_layout()
-    plt.savefig(out_dir / "forecast_plot.png", dpi=150)
-    plt.close()
+    ax.legend()
+    ax.set_title(f"{commodity_name.upper()} — Out-of-sample forecasts")
+    fig.tight_layout()
+    fig.savefig(out_dir / "forecast_plot.png", dpi=150)
 
     return results_df
\ No newline at end of file
@@ -1,10 +1,13 @@
 import numpy as np
 import pandas as pd
 import statsmodels.api as sm
-import matplotlib.pyplot as plt
 
+from functools import lru_cache
 from pathlib import Path
 
+import sklearn
+from joblib import Memory
+from scipy import stats
 from sklearn.ensemble import RandomForestRegressor
 
 # I keep the EWMA identifier as a constant so the filtering logic is explicit and easy to change
@@ -16,6 +19,39 @@ def _fit_ols_hac(y: pd.Series, X: pd.DataFrame, maxlags: int = 21):
     Xc = sm.add_constant(X, has_constant="add")
     return sm.OLS(y, Xc).fit(cov_type="HAC", cov_kwds={"maxlags": maxlags}) # <-IA help to implement
 
+def _ols_arrays(y: np.ndarray, X: np.ndarray):
+    # Plain OLS with a constant, as in _fit_ols_hac but without building a statsmodels results object.
+    # The comparison loop only needs the coefficients, residuals, (X'X)^-1 and the adjusted R².
+    Xc = np.column_stack([np.ones(len(y)), X])
+    pinv_X = np.linalg.pinv(Xc)
+    beta = pinv_X @ y
+    resid = y - Xc @ beta
+    df_resid = len(y) - np.linalg.matrix_rank(Xc)
+
+    y_dev = y - y.mean()
+    r2 = 1.0 - (resid @ resid) / (y_dev @ y_dev)
+    r2_adj = 1.0 - (len(y) - 1) / df_resid * (1.0 - r2)
+    return Xc, beta, resid, pinv_X @ pinv_X.T, df_resid, r2_adj
+
+def _hac_f_pvalue(Xc: np.ndarray, beta: np.ndarray, resid: np.ndarray, xtx_inv: np.ndarray, df_resid: int, R: np.ndarray, maxlags: int = 21):
+    # Joint F-test of R beta = 0 with Newey-West (Bartlett kernel) HAC covariance.
+    # Same computation as statsmodels' cov_type="HAC" + f_test, done on arrays: S = sum_h w_h (G_h + G_h'), V = (X'X)^-1 S (X'X)^-1
+    xu = Xc * resid[:, None]
+    S = xu.T @ xu
+    for lag in range(1, maxlags + 1):
+        G = xu[lag:].T @ xu[:-lag]
+        S += (1.0 - lag / (maxlags + 1.0)) * (G + G.T)
+    V = xtx_inv @ S @ xtx_inv.T
+
+    # As in statsmodels' Wald test, the constraint covariance is pseudo-inverted and the numerator degrees of freedom
+    # is its rank: a degenerate conflict regressor (e.g. all zeros) gives rank 0 and a NaN p-value instead of an error
+    Rb = R @ beta
+    RVR = R @ V @ R.T
+    J = np.linalg.matrix_rank(RVR)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        F = Rb @ np.linalg.pinv(RVR) @ Rb / J
+    return float(stats.f.sf(F, J, df_resid))
+
 def run_har_comparison(file_path: Path, commodity_name: str):
     # This function performs an in-sample diagnostic comparison between a baseline HAR model and several HAR-X variants
     # The goal is not forecasting here, but understanding whether conflict variables add explanatory power in-sample
@@ -24,7 +60,7 @@ def run_har_comparison(file_path: Path, commodity_name: str):
         return # If the dataset is missing, the comparison cannot be run
 
     # I need to load the final regression dataset prepared by the pipeline
-    df = pd.read_csv(file_path, parse_dates=["Date"])
+    df = pd.read_csv(file_path, parse_dates=["Date"], date_format="%Y-%m-%d")
 
     out_dir = Path("results") / "in_sample" / commodity_name.upper()
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -41,11 +77,17 @@ def run_har_comparison(file_path: Path, commodity_name: str):
 
     # Candidate conflict variables are identified by name patterns
     # (IA suggestion) This avoids hard-coding column names and keeps the logic flexible
-    candidates = [
-        c for c in df.columns
-        if ("log_deaths" in c.lower())
-        and (EWMA_KEEP in c.lower())
-        and (c.endswith("_lag0") or c.endswith("_lag1"))]
+    # Column names are lowercased once and filtered with vectorized Index.str masks
+    cols = df.columns
+    low = cols.str.lower()
+    candidates = cols[
+        low.str.contains("log_deaths", regex=False)
+        & low.str.contains(EWMA_KEEP, regex=False)
+        & cols.str.endswith(("_lag0", "_lag1"))]
+    # Lowercased names and lag masks are computed once and reused for every family below
+    candidates_low = candidates.str.lower()
+    lag0_mask = candidates.str.endswith("_lag0")
+    lag1_mask = candidates.str.endswith("_lag1")
 
     name = commodity_name.lower()
 
@@ -69,14 +111,14 @@ def run_har_comparison(file_path: Path, commodity_name: str):
     variants = {}
     for fam in families:
         # Each family is tested separately to keep interpretations clean
-        fam_cols = [c for c in candidates if fam in c.lower()]
-        if not fam_cols:
+        fam_mask = candidates_low.str.contains(fam, regex=False)
+        if not fam_mask.any():
             continue
 
         # (IA suggestion) Lag-specific variants allow us to test whether conflict information
         # affects volatility immediately (lag 0) or with a delay (lag 1), rather than pooling both effects into a single regression.
-        lag0_cols = [c for c in fam_cols if c.endswith("_lag0")]
-        lag1_cols = [c for c in fam_cols if c.endswith("_lag1")]
+        lag0_cols = candidates[fam_mask & lag0_mask].tolist()
+        lag1_cols = candidates[fam_mask & lag1_mask].tolist()
 
         if lag0_cols:
             variants[f"HAR-X ({fam}, lag 0)"] = lag0_cols
@@ -88,36 +130,48 @@ def run_har_comparison(file_path: Path, commodity_name: str):
         return
 
     # Each HAR-X variant is compared against the same HAR baseline
+    # Variants that end up on the same rows share one baseline fit (keyed by the row mask)
+    # The comparison only needs adjusted R² and the HAC F-test, so it runs on arrays (_ols_arrays / _hac_f_pvalue);
+    # statsmodels is used once, for the coefficient table of the best variant
+    notna = df.notna()
+    base_r2a = {}
+    variant_rows = {}
     results = []
     for label, conf_cols in variants.items():
         cols_required = features_base + conf_cols + [target]
-        data_common = df.dropna(subset=cols_required).copy()
+        mask = notna[cols_required].all(axis=1).to_numpy()
+        data_common = df.loc[mask]
         # Using a common sample ensures a fair comparison between HAR and HAR-X models
 
         if len(data_common) < 200: # Very small samples would make inference meaningless
             continue
+        variant_rows[label] = mask
 
-        base = _fit_ols_hac(
-            data_common[target],
-            data_common[features_base])
+        y = data_common[target].to_numpy(dtype=np.float64)
+        mask_key = mask.tobytes()
+        if mask_key not in base_r2a:
+            base_r2a[mask_key] = _ols_arrays(y, data_common[features_base].to_numpy(dtype=np.float64))[-1]
         
-        aug = _fit_ols_hac(
-            data_common[target],
-            data_common[features_base + conf_cols])
+        Xc, beta, resid, xtx_inv, df_resid, aug_r2a = _ols_arrays(
+            y,
+            data_common[features_base + conf_cols].to_numpy(dtype=np.float64))
 
         # Adjusted R² is used to account for different numbers of regressors
-        delta_r2a = aug.rsquared_adj - base.rsquared_adj
+        delta_r2a = aug_r2a - base_r2a[mask_key]
 
         # Joint F-test checks whether the conflict block adds explanatory power
-        f_test = aug.f_test([f"{c} = 0" for c in conf_cols])
+        # The restrictions select the conflict coefficients (after the constant and the HAR terms) as a numeric matrix
+        n_base = 1 + len(features_base)
+        R = np.eye(len(conf_cols), n_base + len(conf_cols), k=n_base)
+        p_value = _hac_f_pvalue(Xc, beta, resid, xtx_inv, df_resid, R)
 
         results.append({
             "Variant": label,
             "N": len(data_common),
-            "R2_Base": base.rsquared_adj,
-            "R2_Aug": aug.rsquared_adj,
+            "R2_Base": base_r2a[mask_key],
+            "R2_Aug": aug_r2a,
             "Delta_R2": delta_r2a,
-            "p-value": float(f_test.pvalue)})
+            "p-value": p_value})
 
     if not results:
         print(f"No sufficient data for {commodity_name}")
@@ -146,7 +200,6 @@ def run_har_comparison(file_path: Path, commodity_name: str):
 
     # For illustration, we display detailed output for the best-performing variant
     best_label = res.iloc[0]["Variant"] # Selects the HAR-X variant that achieved the largest improvement over the baseline HAR model
-    best_cols = variants[best_label] # These are the conflict variables included in the best model
 
     best = res.iloc[0]
     if best["Delta_R2"] > 0 and best["p-value"] < 0.05:
@@ -160,7 +213,8 @@ def run_har_comparison(file_path: Path, commodity_name: str):
     print(f"\nConclusion : ({commodity_name.upper()}): {conclusion}\n")
 
     # I keep only rows where all variables needed for the best model are available
-    data_best = df.dropna(subset=features_base + best_cols + [target]).copy()
+    data_best = df.loc[variant_rows[best_label]]
+    best_cols = variants[best_label] # These are the conflict variables included in the best model
 
     best_model = _fit_ols_hac(
         data_best[target],
@@ -170,11 +224,7 @@ def run_har_comparison(file_path: Path, commodity_name: str):
     coef_table = best_model.summary2().tables[1]
     coef_table.to_csv(out_dir / "best_model_coefficients.csv", sep=";", float_format="%.6f", index=True)
 
-def fit_random_forest(
-    X_train: pd.DataFrame,
-    y_train: pd.Series ,
-    random_state: int = 42):
-    
+def _fit_random_forest(X_train, y_train, random_state: int):
     # Train a Random Forest model for volatility forecasting
     # It can capture interactions and non-linear effects that linear HAR-type models cannot
  
@@ -191,7 +241,32 @@ def fit_random_forest(
 
     return model
 
-def predict_random_forest(model: RandomForestRegressor, X_test: pd.DataFrame):
+# Optional on-disk cache of fitted forests (cache=True), keyed on the training arrays and the seed.
+# It lives in <repo>/.cache/rf/<scikit-learn version>, so forests pickled by another version are never loaded back,
+# and is trimmed to _RF_CACHE_LIMIT (least recently used forests first) once per process, when it is opened.
+_RF_CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache" / "rf"
+_RF_CACHE_LIMIT = "500M"
+
+@lru_cache(maxsize=1)
+def _rf_cache():
+    # The joblib Memory is only created on first use, so nothing is touched on disk unless caching is requested
+    memory = Memory(_RF_CACHE_DIR / sklearn.__version__, verbose=0)
+    memory.reduce_size(bytes_limit=_RF_CACHE_LIMIT)
+    return memory.cache(_fit_random_forest)
+
+def fit_random_forest(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    random_state: int = 42,
+    cache: bool = False):
+
+    if not cache:
+        return _fit_random_forest(X_train, y_train, random_state)
+
+    # Identical windows (same data, same seed) always give the same forest, so the cached fit is returned when available
+    return _rf_cache()(X_train, y_train, random_state)
+
+def predict_random_forest(model: RandomForestRegressor, X_test: np.ndarray):
     # Generate out-of-sample volatility predictions.
 
     # The model outputs a point forecast for next-day realized volatility.